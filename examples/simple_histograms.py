@@ -21,10 +21,9 @@ pad.cd()
 h1 = ROOT.TH1F("h1", ";x;y", 40, 0., 1.)
 h2 = ROOT.TH1F("h2", ";x;y", 40, 0., 1.)
 
-# fill with two gaussians
-for _ in range(1000):
-    h1.Fill(random.gauss(mu=0.33, sigma=0.05))
-    h2.Fill(random.gauss(mu=0.67, sigma=0.1))
+# fill with two gaussians, passing all samples at once to avoid per-entry Fill calls
+r.fill_hist(h1, (random.gauss(mu=0.33, sigma=0.05) for _ in range(1000)))
+r.fill_hist(h2, (random.gauss(mu=0.67, sigma=0.1) for _ in range(1000)))
 
 # setup the style of the histograms and the axes of the first one
 r.setup_hist(h1, props={"LineColor": 2})
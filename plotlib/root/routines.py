@@ -6,11 +6,16 @@ Pre-configured ROOT plotting routines that create and return objects.
 
 
 __all__ = [
-    "create_object", "create_canvas", "create_legend", "create_legend_box", "create_top_left_label",
-    "create_top_right_label", "create_cms_labels", "draw_objects",
+    "create_object", "release_object", "clear_object_cache", "create_canvas", "create_legend",
+    "create_legend_box", "create_top_left_label", "create_top_right_label", "create_cms_labels",
+    "draw_objects", "render_batch",
 ]
 
 
+import collections
+import functools
+import multiprocessing
+
 import ROOT
 
 from plotlib.root.styles import styles
@@ -18,36 +23,83 @@ from plotlib.root.tools import (
     get_canvas_pads, setup_canvas, setup_pad, setup_latex, setup_legend, setup_box, get_xy,
     calculate_legend_coords,
 )
-from plotlib.util import merge_dicts, create_random_name
+from plotlib.util import merge_defaults, create_sequential_name
+
+
+# cache of created objects, mapping id -> object in order of creation
+object_cache = collections.OrderedDict()
 
+# maximum number of objects to keep in the cache, no limit when None, see create_object
+object_cache_size = None
 
-object_cache = []
+# cache of ROOT classes used in create_object, mapping class name -> class
+_object_classes = {}
+
+# formatters of composite cms label texts for horizontal and vertical layouts
+_format_cms_label_horizontal = "#font[63]{{#scale[{:.3f}]{{{}}}}} {}".format
+_format_cms_label_vertical = "#splitline{{#scale[{:.3f}]{{#font[63]{{{}}}}}}}{{{}}}".format
 
 
 def create_object(cls_name, *args, **kwargs):
     """
     Creates and returns a new ROOT object, constructed via ``ROOT.<cls_name>(*args, **kwargs)`` and
     puts it in an object cache to prevent it from going out-of-scope given ROOTs memory management.
+    When :py:attr:`object_cache_size` is set, the oldest objects are dropped from the cache once
+    the number of cached objects exceeds this size.
+
+    .. note::
+
+        Objects are dropped in order of their creation, not of their last use, since the cache is
+        not aware of how objects are used afterwards. A dropped object might be deleted by ROOT even
+        if it is still in use, e.g. a canvas created early on that is still being drawn into, along
+        with all its pads. Keep your own references to such objects when setting a cache size.
     """
-    obj = getattr(ROOT, cls_name)(*args, **kwargs)
-    object_cache.append(obj)
+    cls = _object_classes.get(cls_name)
+    if cls is None:
+        cls = _object_classes[cls_name] = getattr(ROOT, cls_name)
+
+    obj = cls(*args, **kwargs)
+    object_cache[id(obj)] = obj
+
+    if object_cache_size is not None:
+        while len(object_cache) > object_cache_size:
+            object_cache.popitem(last=False)
+
     return obj
 
 
+def release_object(obj):
+    """
+    Removes an object *obj* previously created with :py:func:`create_object` from the object cache
+    so that it can be deleted once it goes out of scope.
+    """
+    object_cache.pop(id(obj), None)
+
+
+def clear_object_cache():
+    """
+    Removes all objects from the object cache.
+    """
+    object_cache.clear()
+
+
 def create_canvas(name=None, title=None, width=None, height=None, divide=(1,), props=None,
         pad_props=None):
     if not name:
-        name = create_random_name("canvas")
+        # use a dedicated prefix as ROOT deletes existing canvases with the same name
+        name = create_sequential_name("plotlib_canvas")
 
     title = title if title is not None else name
     width = width if width is not None else styles.canvas_width
     height = height if height is not None else styles.canvas_height
 
     canvas = create_object("TCanvas", name, title, width, height)
-    canvas.Divide(*divide)
+    if divide:
+        canvas.Divide(*divide)
     setup_canvas(canvas, width, height, props)
 
-    pads = get_canvas_pads(canvas)
+    # without division, no additional pad is created and the canvas itself is used as the pad
+    pads = get_canvas_pads(canvas) if divide else [canvas]
     for pad in pads:
         setup_pad(pad, pad_props)
 
@@ -67,21 +119,20 @@ def create_legend(*args, **kwargs):
 def create_legend_box(legend, pad, mode="", x1=None, x2=None, y1=None, y2=None, padding=0,
         x_padding=None, x1_padding=None, x2_padding=None, y_padding=None, y1_padding=None,
         y2_padding=None, props=None):
-    # determine the padding
-    if x1_padding is None:
-        x1_padding = padding if x_padding is None else x_padding
-    if x2_padding is None:
-        x2_padding = padding if x_padding is None else x_padding
-    if y1_padding is None:
-        y1_padding = padding if y_padding is None else y_padding
-    if y2_padding is None:
-        y2_padding = padding if y_padding is None else y_padding
-
-    # convert paddings from pixel (>=1) to NDC values
-    x1_padding = pad.PixeltoX(x1_padding) if abs(x1_padding) >= 1 else x1_padding
-    x2_padding = pad.PixeltoX(x2_padding) if abs(x2_padding) >= 1 else x2_padding
-    y1_padding = pad.PixeltoY(y1_padding) if abs(y1_padding) >= 1 else y1_padding
-    y2_padding = pad.PixeltoY(y2_padding) if abs(y2_padding) >= 1 else y2_padding
+    # determine the paddings and convert them from pixel (>=1) to NDC values
+    paddings = []
+    for _padding, axis_padding, is_x in [
+        (x1_padding, x_padding, True),
+        (x2_padding, x_padding, True),
+        (y1_padding, y_padding, False),
+        (y2_padding, y_padding, False),
+    ]:
+        if _padding is None:
+            _padding = padding if axis_padding is None else axis_padding
+        if abs(_padding) >= 1:
+            _padding = pad.PixeltoX(_padding) if is_x else pad.PixeltoY(_padding)
+        paddings.append(_padding)
+    x1_padding, x2_padding, y1_padding, y2_padding = paddings
 
     if x1 is None:
         x1 = pad.GetLeftMargin() if "l" in mode else (legend.GetX1() - x1_padding)
@@ -110,7 +161,7 @@ def create_top_left_label(text, x=None, y=None, pad=None, props=None, **kwargs):
         y = y_default
 
     # default props
-    props = merge_dicts({"TextAlign": 11}, props)
+    props = merge_defaults({"TextAlign": 11}, props)
 
     # create and setup the label
     label = create_object("TLatex", x, y, text)
@@ -130,7 +181,7 @@ def create_top_right_label(text, x=None, y=None, pad=None, props=None, **kwargs)
         y = y_default
 
     # default props
-    props = merge_dicts({"TextAlign": 31}, props)
+    props = merge_defaults({"TextAlign": 31}, props)
 
     # create and setup the label
     label = create_object("TLatex", x, y, text)
@@ -140,7 +191,7 @@ def create_top_right_label(text, x=None, y=None, pad=None, props=None, **kwargs)
 
 
 def create_cms_labels(cms="CMS", postfix="Preliminary", layout="inside_vertical", x=None, y=None,
-        pad=None, text_size=28, text_size_postfix=None, **kwargs):
+        pad=None, text_size=28, text_size_postfix=None, separate_cms=True, lazy=False, **kwargs):
     # check the layout
     layouts = ["inside_vertical", "inside_horizontal", "outside_horizontal"]
     if layout not in layouts:
@@ -166,24 +217,78 @@ def create_cms_labels(cms="CMS", postfix="Preliminary", layout="inside_vertical"
     props2["TextAlign"] = props1["TextAlign"]
     text_scale = props1["TextSize"] / float(props2["TextSize"])
 
-    # create the labels
+    # build the composite label text
     if is_horizontal:
-        tmpl2 = "#font[63]{{#scale[{:.3f}]{{{}}}}} {}"
+        text2 = _format_cms_label_horizontal(text_scale, cms, postfix)
     else:
-        tmpl2 = "#splitline{{#scale[{:.3f}]{{#font[63]{{{}}}}}}}{{{}}}"
-    label1 = create_object("TLatex", x, y, cms)
-    label2 = create_object("TLatex", x, y, tmpl2.format(text_scale, cms, postfix))
-    setup_latex(label1, props1)
-    setup_latex(label2, props2)
+        text2 = _format_cms_label_vertical(text_scale, cms, postfix)
 
-    return [label1, label2]
+    # the composite label already contains the cms text, so the separate label is optional
+    label_args = [(x, y, text2, props2)]
+    if separate_cms:
+        label_args.insert(0, (x, y, cms, props1))
+
+    # when lazy, return callables that only create and draw the labels when invoked, which is
+    # supported by draw_objects
+    if lazy:
+        return [functools.partial(_create_label, *args, draw=True) for args in label_args]
+
+    # create the labels
+    return [_create_label(*args) for args in label_args]
+
+
+def _create_label(x, y, text, props, draw=False):
+    label = create_object("TLatex", x, y, text)
+    setup_latex(label, props)
+
+    if draw:
+        label.Draw()
+
+    return label
 
 
 def draw_objects(objs):
     for obj in objs:
-        if getattr(obj, "Draw", None) is None and callable(obj):
-            obj()
-        elif isinstance(obj, tuple) and len(obj) == 2:
+        # (object, draw option) tuples
+        if isinstance(obj, tuple) and len(obj) == 2:
             obj[0].Draw(obj[1])
+            continue
+
+        # resolve the draw method only once, fall back to calling the object itself
+        draw = getattr(obj, "Draw", None)
+        if draw is not None:
+            draw()
+        elif callable(obj):
+            obj()
         else:
-            obj.Draw()
+            raise TypeError("cannot draw object '{}' of type {}".format(obj, obj.__class__))
+
+
+def _init_batch_worker():
+    ROOT.gROOT.SetBatch(True)
+
+
+def render_batch(func, jobs, workers=None):
+    """
+    Calls *func* once for each element in *jobs* in a pool of *workers* processes and returns the
+    list of results in the same order. *func* is supposed to create, draw and save a plot for a
+    single job, independently of all others, and both *func* and *jobs* must be picklable. When
+    *workers* is *None*, the number of CPUs is used. ROOT is put into batch mode in all workers.
+    Processes are forked where possible so that the already imported ROOT module is shared.
+    """
+    ctx = multiprocessing
+    if hasattr(multiprocessing, "get_context") and "fork" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("fork")
+
+    pool = ctx.Pool(processes=workers, initializer=_init_batch_worker)
+    try:
+        results = pool.map(func, jobs)
+    except:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+    return results
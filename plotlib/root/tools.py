@@ -10,12 +10,12 @@ __all__ = [
     "setup_pad", "setup_x_axis", "setup_y_axis", "setup_z_axis", "setup_axes", "setup_latex",
     "setup_legend", "setup_hist", "setup_graph", "setup_line", "setup_func", "setup_box",
     "setup_ellipse", "pixel_to_coord", "get_xy", "get_x", "get_y", "get_stable_distance",
-    "calculate_legend_coords", "fill_legend", "set_hist_value", "add_hist_value",
+    "calculate_legend_coords", "fill_legend", "set_hist_value", "add_hist_value", "fill_hist",
     "show_hist_underflow", "show_hist_overflow",
 ]
 
 
-import math
+import array
 
 import ROOT
 import six
@@ -24,26 +24,65 @@ from plotlib.util import merge_dicts
 from plotlib.root.styles import styles
 
 
+# type tuples resolved once for use in isinstance checks
+_string_types = six.string_types
+_integer_types = six.integer_types
+_number_types = six.integer_types + (float,)
+
+
+# cache of setters used in apply_properties, mapping (class, property name) -> unbound setter, or
+# None when the class has no callable setter for that property
+_setters = {}
+
+# cache of setters for complete sets of properties, mapping (class, property names) -> setters
+_setter_plans = {}
+
+
+def _get_setter(cls, name):
+    key = (cls, name)
+    if key not in _setters:
+        # prefer Set<name>, only look for the plain name when it does not exist
+        setter = getattr(cls, "Set{}".format(name), None)
+        if setter is None:
+            setter = getattr(cls, name, None)
+        _setters[key] = setter if callable(setter) else None
+
+    return _setters[key]
+
+
 def apply_properties(obj, props, *_props):
-    for name, value in six.iteritems(merge_dicts(props, *_props)):
-        # determine the setter to invoke
-        setter = getattr(obj, "Set{}".format(name), getattr(obj, name, None))
-        if not callable(setter):
+    # only merge when there is more than one non-empty source of properties
+    sources = [p for p in (props,) + _props if p]
+    if not sources:
+        return
+    props = sources[0] if len(sources) == 1 else merge_dicts(*sources)
+
+    # get the setters for all properties at once, determining them on the first call per class
+    cls = obj.__class__
+    key = (cls, tuple(props))
+    setters = _setter_plans.get(key)
+    if setters is None:
+        setters = _setter_plans[key] = tuple(_get_setter(cls, name) for name in props)
+
+    for setter, value in zip(setters, props.values()):
+        if setter is None:
             continue
 
         # case 1: simple value, i.e., not a tuple
         if not isinstance(value, tuple):
-            setter(value)
+            setter(obj, value)
 
         # case 2: tuple
         else:
-            setter(*value)
+            setter(obj, *value)
 
 
 def get_canvas_pads(canvas):
+    # resolve the pad class once rather than per primitive
+    pad_cls = ROOT.TPad
     return [
         p for p in canvas.GetListOfPrimitives()
-        if isinstance(p, ROOT.TPad)
+        if isinstance(p, pad_cls)
     ]
 
 
@@ -60,8 +99,10 @@ def setup_style(props=None):
 
 
 def setup_canvas(canvas, width=None, height=None, props=None):
-    canvas.SetWindowSize(width or styles.canvas_width, height or styles.canvas_height)
-    canvas.SetCanvasSize(width or styles.canvas_width, height or styles.canvas_height)
+    width = width or styles.canvas_width
+    height = height or styles.canvas_height
+    canvas.SetWindowSize(width, height)
+    canvas.SetCanvasSize(width, height)
     apply_properties(canvas, styles.canvas, props)
 
 
@@ -70,66 +111,89 @@ def setup_pad(pad, props=None):
 
 
 def setup_x_axis(axis, pad, props=None, color=None, color_flags="l", x2=False):
-    canvas_height = pad.GetCanvas().GetWindowHeight()
-
-    _props = (styles.x2_axis if x2 else styles.x_axis).copy()
+    # determine defaults that are not defined by the style, reading from the current style directly
+    current_style = styles.current_style
+    style = current_style.x2_axis if x2 else current_style.x_axis
+    defaults = {}
 
     # auto ticks
-    pad_width = 1. - pad.GetLeftMargin() - pad.GetRightMargin()
-    real_height = pad.YtoPixel(pad.GetY1()) - pad.YtoPixel(pad.GetY2())
-    real_width = pad.XtoPixel(pad.GetX2()) - pad.XtoPixel(pad.GetX1())
-    if pad_width != 0 and real_height != 0:
-        tick_length = styles.auto_ticklength / pad_width * real_width / real_height
-        _props.setdefault("TickLength", tick_length)
+    if "TickLength" not in style:
+        pad_width = 1. - pad.GetLeftMargin() - pad.GetRightMargin()
+        real_height = pad.YtoPixel(pad.GetY1()) - pad.YtoPixel(pad.GetY2())
+        real_width = pad.XtoPixel(pad.GetX2()) - pad.XtoPixel(pad.GetX1())
+        if pad_width != 0 and real_height != 0:
+            tick_length = current_style.auto_ticklength / pad_width * real_width / real_height
+            defaults["TickLength"] = tick_length
 
-    _props.setdefault("TitleOffset", 1.075 * styles.canvas_height / canvas_height)
+    if "TitleOffset" not in style:
+        canvas_height = pad.GetCanvas().GetWindowHeight()
+        defaults["TitleOffset"] = 1.075 * current_style.canvas_height / canvas_height
 
-    apply_properties(axis, _props, props)
+    apply_properties(axis, defaults, style, props)
 
     if color is not None:
         set_color(axis, color, flags=color_flags)
 
 
 def setup_y_axis(axis, pad, props=None, color=None, color_flags="l"):
-    canvas_width = pad.GetCanvas().GetWindowWidth()
-
-    _props = styles.y_axis.copy()
+    # determine defaults that are not defined by the style, reading from the current style directly
+    current_style = styles.current_style
+    style = current_style.y_axis
+    defaults = {}
 
-    _props.setdefault("TitleOffset", 1.4 * styles.canvas_width / canvas_width)
+    if "TitleOffset" not in style:
+        canvas_width = pad.GetCanvas().GetWindowWidth()
+        defaults["TitleOffset"] = 1.4 * current_style.canvas_width / canvas_width
 
     # auto ticks
-    pad_height = 1. - pad.GetTopMargin() - pad.GetBottomMargin()
-    if pad_height != 0:
-        _props.setdefault("TickLength", styles.auto_ticklength / pad_height)
+    if "TickLength" not in style:
+        pad_height = 1. - pad.GetTopMargin() - pad.GetBottomMargin()
+        if pad_height != 0:
+            defaults["TickLength"] = current_style.auto_ticklength / pad_height
 
-    apply_properties(axis, _props, props)
+    apply_properties(axis, defaults, style, props)
 
     if color is not None:
         set_color(axis, color, flags=color_flags)
 
 
 def setup_z_axis(axis, pad, props=None, color=None, color_flags="l"):
-    canvas_width = pad.GetCanvas().GetWindowWidth()
+    # determine defaults that are not defined by the style, reading from the current style directly
+    current_style = styles.current_style
+    style = current_style.z_axis
+    defaults = {}
 
-    _props = styles.z_axis.copy()
+    if "TitleOffset" not in style:
+        canvas_width = pad.GetCanvas().GetWindowWidth()
+        defaults["TitleOffset"] = 1.4 * current_style.canvas_width / canvas_width
 
-    _props.setdefault("TitleOffset", 1.4 * styles.canvas_width / canvas_width)
-
-    apply_properties(axis, _props, props)
+    apply_properties(axis, defaults, style, props)
 
     if color is not None:
         set_color(axis, color, flags=color_flags)
 
 
+# cache of axes per class used in setup_axes, mapping class -> ((unbound axis getter, setup), ...)
+_axis_plans = {}
+
+
 def setup_axes(obj, pad, **kwargs):
-    for s, f in [("X", setup_x_axis), ("Y", setup_y_axis), ("Z", setup_z_axis)]:
-        axis_getter = getattr(obj, "Get{}axis".format(s), None)
-        if callable(axis_getter):
-            # get the axis and set it up
-            f(axis_getter(), pad, **kwargs)
-        else:
-            # we can stop here
-            break
+    # determine the axis getters once per class
+    cls = obj.__class__
+    plan = _axis_plans.get(cls)
+    if plan is None:
+        plan = []
+        for s, f in [("X", setup_x_axis), ("Y", setup_y_axis), ("Z", setup_z_axis)]:
+            axis_getter = getattr(cls, "Get{}axis".format(s), None)
+            if not callable(axis_getter):
+                # we can stop here
+                break
+            plan.append((axis_getter, f))
+        plan = _axis_plans[cls] = tuple(plan)
+
+    # get the axes and set them up
+    for axis_getter, f in plan:
+        f(axis_getter(obj), pad, **kwargs)
 
 
 def setup_latex(latex, props=None, color=None, color_flags="t"):
@@ -188,31 +252,55 @@ def setup_ellipse(ellipse, props=None):
     apply_properties(ellipse, styles.ellipse, props)
 
 
-def set_color(obj, color, flags="lmft"):
-    funcs = {
-        "l": ["SetLineColor"],
-        "m": ["SetMarkerColor"],
-        "f": ["SetFillColor"],
-        "t": ["SetTextColor", "SetLabelColor"],
-    }
+# cache of colors given as strings in set_color, mapping lower-case name -> ROOT color, prefilled
+# with the predefined colors of ROOT
+_colors = {
+    name.lower(): getattr(ROOT, "k" + name)
+    for name in [
+        "White", "Black", "Gray", "Red", "Green", "Blue", "Yellow", "Magenta", "Cyan", "Orange",
+        "Spring", "Teal", "Azure", "Violet", "Pink",
+    ]
+}
 
-    # color can be a string, translate it to a ROOT.k<Color>
-    if isinstance(color, six.string_types):
-        color = getattr(ROOT, "k" + color.capitalize())
+# color setters per flag in set_color
+_color_setters = {
+    "l": ("SetLineColor",),
+    "m": ("SetMarkerColor",),
+    "f": ("SetFillColor",),
+    "t": ("SetTextColor", "SetLabelColor"),
+}
 
-    for flag in flags:
-        if flag not in funcs:
-            raise ValueError("flag '{}' is unknown".format(flag))
+# cache of color setters for combinations of flags, mapping flags -> setter names
+_color_setter_plans = {}
 
-        for attr in funcs[flag]:
-            func = getattr(obj, attr, None)
-            if not callable(func):
-                continue
 
-            if isinstance(color, (tuple, list)):
-                func(*color)
-            else:
-                func(color)
+def _get_color_setters(flags):
+    if flags not in _color_setter_plans:
+        for flag in flags:
+            if flag not in _color_setters:
+                raise ValueError("flag '{}' is unknown".format(flag))
+        _color_setter_plans[flags] = tuple(
+            attr for flag in flags for attr in _color_setters[flag]
+        )
+
+    return _color_setter_plans[flags]
+
+
+def set_color(obj, color, flags="lmft"):
+    attrs = _get_color_setters(flags)
+
+    # color can be a string, translate it to a ROOT.k<Color>
+    if isinstance(color, _string_types):
+        key = color.lower()
+        if key not in _colors:
+            _colors[key] = getattr(ROOT, "k" + color.capitalize())
+        color = _colors[key]
+
+    args = tuple(color) if isinstance(color, (tuple, list)) else (color,)
+    for attr in attrs:
+        func = getattr(obj, attr, None)
+        if callable(func):
+            func(*args)
 
 
 def pixel_to_coord(pad, x=None, y=None):
@@ -226,23 +314,45 @@ def pixel_to_coord(pad, x=None, y=None):
         return pad.PixeltoX(x), pad.PixeltoY(-y)
 
 
+def _get_pad_chain(pad):
+    # returns the pad and all its parents up to the top-level canvas, which is not cached since
+    # that would keep pads alive and only save a few calls for typical pad hierarchies
+    chain = [pad]
+    while True:
+        parent = chain[-1].GetCanvas()
+        if parent != chain[-1]:
+            chain.append(parent)
+        else:
+            break
+
+    return chain
+
+
+# anchors accepted by get_x and get_y, mapped to whether they refer to the right or top side
+_x_anchors_rtl = {"left": False, "l": False, "right": True, "r": True}
+_y_anchors_ttb = {"bottom": False, "b": False, "top": True, "t": True}
+
+
 def get_x(x, canvas=None, anchor="left", offset=0, margins=True, pixel=False):
     # check arguments
-    if anchor.lower() not in ["left", "l", "right", "r"]:
-        raise Exception("anchor must be 'left', 'l', 'right' or 'r'")
-    rtl = anchor.lower() in ["right", "r"]
+    rtl = _x_anchors_rtl.get(anchor.lower())
+    if rtl is None:
+        raise ValueError("anchor must be 'left', 'l', 'right' or 'r'")
+
+    # the truth value of the canvas is needed multiple times
+    has_canvas = bool(canvas)
 
     # convert pixel to relative coordinate
-    if isinstance(x, six.integer_types):
-        if canvas:
+    if isinstance(x, _integer_types):
+        if has_canvas:
             x = pixel_to_coord(canvas, x=x)
         else:
             x /= float(styles.canvas_width)
 
     # add the offset
     if offset:
-        if isinstance(offset, six.integer_types):
-            if canvas:
+        if isinstance(offset, _integer_types):
+            if has_canvas:
                 offset = pixel_to_coord(canvas, x=offset)
             else:
                 offset /= float(styles.canvas_width)
@@ -254,18 +364,11 @@ def get_x(x, canvas=None, anchor="left", offset=0, margins=True, pixel=False):
 
     # include margins
     if margins:
-        if canvas:
-            # recursively add parent canvas margins
+        if has_canvas:
+            # add margins of the canvas and all its parents
             m = 0.
-            obj = canvas
-            while True:
+            for obj in _get_pad_chain(canvas):
                 m += obj.GetRightMargin() if rtl else obj.GetLeftMargin()
-                parent = obj.GetCanvas()
-                if parent != obj:
-                    obj = parent
-                else:
-                    break
-            # add parent margins
         else:
             # consider pad margins
             m = getattr(styles.pad, "RightMargin" if rtl else "LeftMargin", 0.)
@@ -273,7 +376,7 @@ def get_x(x, canvas=None, anchor="left", offset=0, margins=True, pixel=False):
 
     # convert to pixels
     if pixel:
-        if canvas:
+        if has_canvas:
             x = canvas.XtoPixel(x)
         else:
             x = int(round(x * styles.canvas_width))
@@ -283,21 +386,24 @@ def get_x(x, canvas=None, anchor="left", offset=0, margins=True, pixel=False):
 
 def get_y(y, canvas=None, anchor="bottom", offset=0, margins=True, pixel=False):
     # check arguments
-    if anchor.lower() not in ["bottom", "b", "top", "t"]:
-        raise Exception("anchor must be 'bottom', 'b', 'top' or 't'")
-    ttb = anchor.lower() in ["top", "t"]
+    ttb = _y_anchors_ttb.get(anchor.lower())
+    if ttb is None:
+        raise ValueError("anchor must be 'bottom', 'b', 'top' or 't'")
+
+    # the truth value of the canvas is needed multiple times
+    has_canvas = bool(canvas)
 
     # convert pixel to relative coordinate
-    if isinstance(y, six.integer_types):
-        if canvas:
+    if isinstance(y, _integer_types):
+        if has_canvas:
             y = pixel_to_coord(canvas, y=y)
         else:
             y /= float(styles.canvas_height)
 
     # add the offset
     if offset:
-        if isinstance(offset, six.integer_types):
-            if canvas:
+        if isinstance(offset, _integer_types):
+            if has_canvas:
                 offset = pixel_to_coord(canvas, y=offset)
             else:
                 offset /= float(styles.canvas_height)
@@ -309,18 +415,11 @@ def get_y(y, canvas=None, anchor="bottom", offset=0, margins=True, pixel=False):
 
     # include margins
     if margins:
-        if canvas:
-            # recursively add parent canvas margins
+        if has_canvas:
+            # add margins of the canvas and all its parents
             m = 0.
-            obj = canvas
-            while True:
+            for obj in _get_pad_chain(canvas):
                 m += obj.GetTopMargin() if ttb else obj.GetBottomMargin()
-                parent = obj.GetCanvas()
-                if parent != obj:
-                    obj = parent
-                else:
-                    break
-            # add parent margins
         else:
             # consider pad margins
             m = getattr(styles.pad, "TopMargin" if ttb else "BottomMargin", 0.)
@@ -328,7 +427,7 @@ def get_y(y, canvas=None, anchor="bottom", offset=0, margins=True, pixel=False):
 
     # convert to pixels
     if pixel:
-        if canvas:
+        if has_canvas:
             y = canvas.YtoPixel(y)
         else:
             y = int(round(y * styles.canvas_height))
@@ -353,17 +452,17 @@ def get_stable_distance(mode, distance, current=None, reference=None):
 
     if mode == "h":
         # get the current canvas height
-        if isinstance(current, six.string_types):
+        if isinstance(current, _string_types):
             height = styles.get(current).canvas_height
-        elif isinstance(current, six.integer_types + (float,)):
+        elif isinstance(current, _number_types):
             height = current
         else:
             height = current.GetWindowHeight()
 
         # get the reference canvas height
-        if isinstance(reference, six.string_types):
+        if isinstance(reference, _string_types):
             ref_height = styles.get(reference).canvas_height
-        elif isinstance(reference, six.integer_types + (float,)):
+        elif isinstance(reference, _number_types):
             ref_height = reference
         else:
             ref_height = reference.GetWindowHeight()
@@ -372,17 +471,17 @@ def get_stable_distance(mode, distance, current=None, reference=None):
 
     else:  # v
         # get the current canvas width
-        if isinstance(current, six.string_types):
+        if isinstance(current, _string_types):
             width = styles.get(current).canvas_width
-        elif isinstance(current, six.integer_types + (float,)):
+        elif isinstance(current, _number_types):
             width = current
         else:
             width = current.GetWindowWidth()
 
         # get the reference canvas width
-        if isinstance(reference, six.string_types):
+        if isinstance(reference, _string_types):
             ref_width = styles.get(reference).canvas_width
-        elif isinstance(reference, six.integer_types + (float,)):
+        elif isinstance(reference, _number_types):
             ref_width = reference
         else:
             ref_width = reference.GetWindowWidth()
@@ -392,8 +491,41 @@ def get_stable_distance(mode, distance, current=None, reference=None):
     return distance * f
 
 
+# cache of legend coordinates calculated without a pad, see calculate_legend_coords
+_legend_coords_cache = {}
+
+
+def _legend_coords_cache_key(*args):
+    style = styles.current_style
+    pad_style = style.get("pad", {})
+    values = args + tuple(style.get(attr) for attr in (
+        "legend_x1", "legend_x2", "legend_y2", "legend_dy", "canvas_width", "canvas_height",
+    )) + tuple(pad_style.get(attr, 0.) for attr in (
+        "LeftMargin", "RightMargin", "TopMargin", "BottomMargin",
+    ))
+    # include types since integers denote pixels whereas floats denote relative coordinates
+    return tuple((type(v), v) for v in values)
+
+
 def calculate_legend_coords(pad=None, x1=None, x2=None, width=None, y1=None, y2=None, height=None,
         dy=None, n=1):
+    args = (x1, x2, width, y1, y2, height, dy, n)
+
+    # without a pad, the coordinates only depend on the arguments and the current style
+    if pad is not None:
+        return _calculate_legend_coords(pad, *args)
+
+    key = _legend_coords_cache_key(*args)
+    coords = _legend_coords_cache.get(key)
+    if coords is None:
+        if len(_legend_coords_cache) >= 512:
+            _legend_coords_cache.clear()
+        coords = _legend_coords_cache[key] = _calculate_legend_coords(None, *args)
+
+    return coords
+
+
+def _calculate_legend_coords(pad, x1, x2, width, y1, y2, height, dy, n):
     # helpers to sanitize user coordinates, optionally relative to pad
     x_ = lambda x: get_x(abs(x), pad, anchor="left" if x >= 0 else "right")
     y_ = lambda y: get_y(abs(y), pad, anchor="bottom" if y >= 0 else "top")
@@ -439,6 +571,20 @@ def calculate_legend_coords(pad=None, x1=None, x2=None, width=None, y1=None, y2=
     return (x1, y1, x2, y2)
 
 
+# TLatex object that is reused to measure text widths, see _get_measurement_latex
+_measurement_latex = None
+
+
+def _get_measurement_latex():
+    global _measurement_latex
+
+    if _measurement_latex is None:
+        _measurement_latex = ROOT.TLatex()
+        _measurement_latex.SetNDC()
+
+    return _measurement_latex
+
+
 def fill_legend(legend, entries, transposed=True):
     """
     Fills *entries* into a TLegend *legend* with multiple columns in an intuitive fashion. ROOT's
@@ -447,16 +593,20 @@ def fill_legend(legend, entries, transposed=True):
     """
     n = len(entries)
     n_cols = legend.GetNColumns()
-    n_rows = int(math.ceil(float(n) / n_cols))
+    n_rows = -(-n // n_cols)
+
+    # text widths are measured only once per text and relate to the current pad, so they are not
+    # cached across calls
+    tlatex = _get_measurement_latex()
+    tlatex.SetTextFont(legend.GetTextFont() or ROOT.gStyle.GetTextFont())
+    tlatex.SetTextSize(legend.GetTextSize() or ROOT.gStyle.GetTextSize())
+    text_widths = {}
 
     def get_text_width(text):
-        tlatex = ROOT.TLatex(0, 0, text)
-        tlatex.SetNDC()
-        tlatex.SetTextFont(legend.GetTextFont() or ROOT.gStyle.GetTextFont())
-        tlatex.SetTextSize(legend.GetTextSize() or ROOT.gStyle.GetTextSize())
-        width = tlatex.GetXsize()
-        del tlatex
-        return width
+        if text not in text_widths:
+            tlatex.SetText(0, 0, text)
+            text_widths[text] = tlatex.GetXsize()
+        return text_widths[text]
 
     # prepare entries, store label widths
     widths = []
@@ -470,26 +620,25 @@ def fill_legend(legend, entries, transposed=True):
         widths.append(get_text_width(entry[1]))
     entries = _entries
 
-    # fill labels with spaces to ensure every label has the same width
+    # fill labels with spaces to ensure every label has the same width, all paddings are slices of
+    # the longest one which also serves as the empty label
     max_width = max(widths)
-    space_width = get_text_width(" ")
+    space_width = float(get_text_width(" "))
+    empty_label = " " * int(max_width / space_width)
     for entry, width in zip(entries, widths):
-        entry[1] += " " * int(math.floor((max_width - width) / float(space_width)))
-    empty_label = " " * int(math.floor(max_width / float(space_width)))
+        entry[1] += empty_label[:int((max_width - width) / space_width)]
 
-    # add entries in normal or transposed order
+    # when transposed, reorder entries so that columns are filled first and fill up empty cells
     if transposed:
-        for i in range(n_rows):
-            for j in range(n_cols):
-                idx = i + n_rows * j
-                if idx < n:
-                    entry = entries[idx]
-                else:
-                    entry = (entries[n - 1][0], empty_label, "")
-                legend.AddEntry(*entry)
-    else:
-        for entry in entries:
-            legend.AddEntry(*entry)
+        empty_entry = (entries[n - 1][0], empty_label, "")
+        entries = [
+            (entries[idx] if idx < n else empty_entry)
+            for idx in (i + n_rows * j for i in range(n_rows) for j in range(n_cols))
+        ]
+
+    # add entries
+    for entry in entries:
+        legend.AddEntry(*entry)
 
 
 def set_hist_value(hist, i, value, err=None, err2=None):
@@ -516,20 +665,59 @@ def add_hist_value(hist, i, value, err=None, err2=None):
         hist.GetSumw2()[i] = w2 + err2
 
 
+# cache of arrays of unit weights used in fill_hist, mapping length -> array
+_unit_weights = {}
+
+
+def fill_hist(hist, values, weights=None):
+    """
+    Fills all *values* into a one-dimensional histogram *hist* with a single call to ``FillN`` so
+    that the loop over values runs in C++ rather than calling ``Fill`` once per value. *values* and
+    *weights* can be arbitrary sequences of numbers, but contiguous numpy arrays of type float64 or
+    ``array.array``'s of type ``"d"`` are passed to ROOT without being copied. Multi-dimensional
+    numpy arrays are not accepted. When *weights* is *None*, all values are filled with a weight of
+    1. Otherwise, the number of *weights* must match the number of *values*. A
+    :py:class:`ValueError` is raised in both cases.
+    """
+    values = _to_double_buffer(values)
+    n = len(values)
+    if weights is None:
+        weights = _unit_weights.get(n)
+        if weights is None:
+            if len(_unit_weights) >= 16:
+                _unit_weights.clear()
+            weights = _unit_weights[n] = array.array("d", [1.]) * n
+    else:
+        weights = _to_double_buffer(weights)
+        if len(weights) != n:
+            raise ValueError("number of weights ({}) does not match number of values ({})".format(
+                len(weights), n))
+
+    hist.FillN(n, values, weights)
+
+
+def _to_double_buffer(values):
+    if isinstance(values, array.array) and values.typecode == "d":
+        return values
+
+    # numpy arrays, other objects with a dtype such as pandas series are converted below
+    if type(values).__module__ == "numpy":
+        if values.ndim != 1:
+            raise ValueError("cannot fill {}-dimensional array, must be one-dimensional".format(
+                values.ndim))
+        if values.dtype == "float64" and values.flags["C_CONTIGUOUS"]:
+            return values
+        return values.astype("float64", order="C")
+
+    return array.array("d", values)
+
+
 def show_hist_underflow(hist, clear=True):
     """
     Adds the total underflow of a histogram *hist* to the first bin and propagates errors properly.
     When *clear* is *True*, the underflow is set to 0.
     """
-    underflow = hist.GetBinContent(0)
-    if underflow == 0:
-        return
-
-    err2 = None if hist.GetSumw2N() == 0 else hist.GetSumw2()[0]
-    add_hist_value(hist, 1, underflow, err2=err2)
-
-    if clear:
-        set_hist_value(hist, 0, 0., err2=0.)
+    _move_hist_value(hist, 0, 1, clear)
 
 
 def show_hist_overflow(hist, clear=True):
@@ -538,12 +726,25 @@ def show_hist_overflow(hist, clear=True):
     When *clear* is *True*, the overflow is set to 0.
     """
     n_bins = hist.GetNbinsX()
-    overflow = hist.GetBinContent(n_bins + 1)
-    if overflow == 0:
+    _move_hist_value(hist, n_bins + 1, n_bins, clear)
+
+
+def _move_hist_value(hist, src, dst, clear):
+    value = hist.GetBinContent(src)
+    if value == 0:
         return
 
-    err2 = None if hist.GetSumw2N() == 0 else hist.GetSumw2()[n_bins + 1]
-    add_hist_value(hist, n_bins, overflow, err2=err2)
+    # query the sum of squared weights only once and access it directly
+    sumw2 = None if hist.GetSumw2N() == 0 else hist.GetSumw2()
+    if sumw2 is not None:
+        err2 = sumw2[src]
+        w2 = sumw2[dst]
+
+    hist.AddBinContent(dst, value)
+    if sumw2 is not None:
+        sumw2[dst] = w2 + err2
 
     if clear:
-        set_hist_value(hist, n_bins + 1, 0., err2=0.)
+        hist.SetBinContent(src, 0.)
+        if sumw2 is not None:
+            sumw2[src] = 0.
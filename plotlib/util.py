@@ -5,12 +5,21 @@ Helpful utilities.
 """
 
 
-__all__ = ["DotDict", "Styles", "merge_dicts", "create_random_name"]
+__all__ = [
+    "DotDict", "Styles", "merge_dicts", "merge_defaults", "create_random_name",
+    "create_sequential_name",
+]
 
 
+import os
 import copy
+import binascii
+import collections
 import contextlib
-import uuid
+
+
+# sentinel for missing values
+_no_value = object()
 
 
 class DotDict(dict):
@@ -34,17 +43,19 @@ class DotDict(dict):
     ``hasattr``.
     """
 
+    __slots__ = ()
+
     def __getattr__(self, attr):
-        try:
-            return self[attr]
-        except KeyError as e:
-            raise AttributeError(*e.args)
+        value = dict.get(self, attr, _no_value)
+        if value is _no_value:
+            raise AttributeError(attr)
+        return value
 
-    def __setattr__(self, attr, value):
-        self[attr] = value
+    __setattr__ = dict.__setitem__
 
     def copy(self):
-        return self.__class__(super(DotDict, self).copy())
+        # construct the copy directly from self, which avoids an intermediate dict copy
+        return self.__class__(self)
 
 
 class Styles(object):
@@ -114,11 +125,14 @@ class Styles(object):
 
     DEFAULT_STYLE_NAME = "default"
 
+    __slots__ = ("_styles", "_stack", "_current_style")
+
     def __init__(self):
         super(Styles, self).__init__()
 
         self._styles = {}
         self._stack = []
+        self._current_style = None
 
         # register a DotDict for the default style
         self.set(self.__class__.DEFAULT_STYLE_NAME, DotDict())
@@ -127,7 +141,7 @@ class Styles(object):
         """
         Returns the attribute *attr* of the :py:attr:`current_style`.
         """
-        return getattr(self.current_style, attr)
+        return getattr(self._current_style, attr)
 
     @property
     def current_style_name(self):
@@ -138,7 +152,7 @@ class Styles(object):
 
     @property
     def current_style(self):
-        return self.get(self.current_style_name)
+        return self._current_style
 
     def get(self, style_name):
         """
@@ -156,6 +170,10 @@ class Styles(object):
 
         self._styles[style_name] = style
 
+        # keep the reference to the current style up to date
+        if style_name == self.current_style_name:
+            self._current_style = style
+
         return style
 
     def copy(self, src_style_name, dst_style_name):
@@ -170,17 +188,21 @@ class Styles(object):
         """
         Appends *style_name* to the stack of currently used styles.
         """
-        if style_name not in self._styles:
+        style = self._styles.get(style_name)
+        if style is None:
             raise ValueError("cannot use unknown style '{}'".format(style_name))
 
         self._stack.append(style_name)
+        self._current_style = style
 
     def pop(self):
         """
         Removes the last element from the stack of currently used styles and returns the removed
         element.
         """
-        return self._stack.pop()
+        style_name = self._stack.pop()
+        self._current_style = self._styles[self.current_style_name]
+        return style_name
 
     @contextlib.contextmanager
     def use(self, style_name):
@@ -190,7 +212,7 @@ class Styles(object):
         """
         self.push(style_name)
         try:
-            yield self.get(style_name)
+            yield self._current_style
         finally:
             self.pop()
 
@@ -202,15 +224,18 @@ def merge_dicts(*dicts, **kwargs):
     The class of the returned merged dict is configurable via *cls*. If it is *None*, the class is
     inferred from the first dict object in *dicts*.
     """
-    # get or infer the class
+    # get or infer the class, directly using the first object when it is a dict
     cls = kwargs.get("cls", None)
     if cls is None:
-        for d in dicts:
-            if isinstance(d, dict):
-                cls = d.__class__
-                break
+        if dicts and isinstance(dicts[0], dict):
+            cls = dicts[0].__class__
         else:
-            raise TypeError("cannot infer cls as none of the passed objects is of type dict")
+            for d in dicts:
+                if isinstance(d, dict):
+                    cls = d.__class__
+                    break
+            else:
+                raise TypeError("cannot infer cls as none of the passed objects is of type dict")
 
     # start merging
     merged_dict = cls()
@@ -221,12 +246,41 @@ def merge_dicts(*dicts, **kwargs):
     return merged_dict
 
 
+def merge_defaults(defaults, props):
+    """
+    Returns a dict containing *defaults* updated by *props*. When *props* is empty or *None*,
+    *defaults* itself is returned without being copied, so it must not be changed by the caller
+    afterwards.
+    """
+    if not props:
+        return defaults
+
+    return merge_dicts(defaults, props)
+
+
 def create_random_name(prefix="", l=8):
     """
-    Creates and returns a random name string consisting of *l* characters using uuid4 internally.
-    When *prefix* is given, the name will have the format ``<prefix>_<random_name>``.
+    Creates and returns a random name string consisting of *l* hexadecimal characters. When
+    *prefix* is given, the name will have the format ``<prefix>_<random_name>``.
+    """
+    name = binascii.hexlify(os.urandom((l + 1) // 2)).decode("ascii")[:l]
+    if prefix:
+        name = "{}_{}".format(prefix, name)
+    return name
+
+
+# counters of names created per prefix in create_sequential_name
+_name_counters = collections.defaultdict(int)
+
+
+def create_sequential_name(prefix=""):
+    """
+    Creates and returns a name string using a counter that is incremented per *prefix* on each
+    call, so that names are unique within the process and reproducible across runs. When *prefix*
+    is given, the name will have the format ``<prefix>_<number>``.
     """
-    name = uuid.uuid4().hex[:l]
+    _name_counters[prefix] += 1
+    name = str(_name_counters[prefix])
     if prefix:
         name = "{}_{}".format(prefix, name)
     return name